@@ -80,7 +80,7 @@ emcc -O2 -s ALLOW_MEMORY_GROWTH=1 \
     -s MODULARIZE=1 \
     -s EXPORT_ES6=1 \
     -s EXPORT_NAME='createMMIXALModule' \
-    -s ENVIRONMENT='web' \
+    -s ENVIRONMENT='web,worker' \
     mmixal.c mmix-arith.o -o mmixal.js
 
 # Build mmix simulator for browser
@@ -95,7 +95,7 @@ emcc -O2 -s ALLOW_MEMORY_GROWTH=1 \
     -s MODULARIZE=1 \
     -s EXPORT_ES6=1 \
     -s EXPORT_NAME='createMMIXModule' \
-    -s ENVIRONMENT='web' \
+    -s ENVIRONMENT='web,worker' \
     mmix-sim.c mmix-arith.o mmix-io.o -o mmix.js
 rm abstime.h
 
@@ -107,7 +107,7 @@ echo ""
 echo "These modules are configured for browser use with:"
 echo "  - MEMFS (in-memory filesystem)"
 echo "  - EXIT_RUNTIME=0 (reusable modules)"
-echo "  - ES6 module exports"
+echo "  - ES6 module exports, loadable from a Web Worker"
 echo "  - Exposed FS API for virtual filesystem"
 echo ""
 echo "Copy these files to your web server and load them from PyScript."
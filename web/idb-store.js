@@ -0,0 +1,66 @@
+// Minimal IndexedDB key-value store for the MMIX Playground
+// Exposes the subset of the idb-keyval 6 API the playground uses as
+// self.idbKeyval: createStore, get, set, setMany, del, keys and entries.
+// Served from this directory, so storage does not depend on a CDN.
+
+(function () {
+    function promisifyRequest(request) {
+        // Works for requests and for transactions (oncomplete)
+        return new Promise((resolve, reject) => {
+            request.oncomplete = request.onsuccess = () => resolve(request.result);
+            request.onabort = request.onerror = () => reject(request.error);
+        });
+    }
+
+    function createStore(dbName, storeName) {
+        if (typeof indexedDB === 'undefined') {
+            throw new Error('IndexedDB is not available');
+        }
+        const request = indexedDB.open(dbName);
+        request.onupgradeneeded = () => request.result.createObjectStore(storeName);
+        const dbPromise = promisifyRequest(request);
+        // A store is a function running callback on its object store
+        return (mode, callback) => dbPromise.then(
+            (db) => callback(db.transaction(storeName, mode).objectStore(storeName)));
+    }
+
+    function get(key, store) {
+        return store('readonly', (objectStore) => promisifyRequest(objectStore.get(key)));
+    }
+
+    function set(key, value, store) {
+        return store('readwrite', (objectStore) => {
+            objectStore.put(value, key);
+            return promisifyRequest(objectStore.transaction);
+        });
+    }
+
+    function setMany(entries, store) {
+        return store('readwrite', (objectStore) => {
+            for (const [key, value] of entries) {
+                objectStore.put(value, key);
+            }
+            return promisifyRequest(objectStore.transaction);
+        });
+    }
+
+    function del(key, store) {
+        return store('readwrite', (objectStore) => {
+            objectStore.delete(key);
+            return promisifyRequest(objectStore.transaction);
+        });
+    }
+
+    function keys(store) {
+        return store('readonly', (objectStore) => promisifyRequest(objectStore.getAllKeys()));
+    }
+
+    function entries(store) {
+        return store('readonly', (objectStore) => Promise.all([
+            promisifyRequest(objectStore.getAllKeys()),
+            promisifyRequest(objectStore.getAll())
+        ]).then(([allKeys, values]) => allKeys.map((key, i) => [key, values[i]])));
+    }
+
+    self.idbKeyval = { createStore, get, set, setMany, del, keys, entries };
+})();
@@ -1,29 +1,88 @@
 import js
 import json
 import asyncio
-from pyodide.ffi import create_proxy, to_js
+import traceback
+import types
+from pyodide.ffi import create_once_callable, create_proxy, to_js
 from js import console, document, localStorage, Blob, URL
 
+# Bump after rebuilding the modules in mmix/ to invalidate the sw.js cache
+MODULES_VERSION = "1"
+
+# Verbose console tracing at startup; can also be switched at runtime
+# with playground.debug = true from the JS console
+DEBUG = False
+
+# Shown when IndexedDB cannot be used for saved programs and files
+STORAGE_WARNING = ("Browser storage is unavailable: saved programs and uploaded "
+                   "files will be lost when this page is closed.")
+
+# Shared decoder for the listing and output bytes sent by the worker
+_DECODER = js.TextDecoder.new("utf-8")
+
 class StorageManager:
-    """Manages localStorage for persistent code and file storage"""
+    """Manages localStorage and IndexedDB for persistent code and file storage"""
 
     def __init__(self):
         self.CURRENT_CODE_KEY = "mmix.currentCode"
         self.CURRENT_ARGS_KEY = "mmix.currentArgs"
-        self.PROGRAMS_KEY = "mmix.programs"
-        self.FILES_KEY = "mmix.uploadedFiles"
+        self.CURRENT_STDIN_KEY = "mmix.currentStdin"
+
+        # Saved programs and uploaded files live in IndexedDB (idb-store.js,
+        # loaded by index.html), keyed by name. Unlike localStorage it is
+        # asynchronous and not capped at 5 MB. Each store needs a database
+        # of its own. Without IndexedDB they are kept for this session only.
+        self._programs_store = None
+        self._files_store = None
+        try:
+            self._programs_store = js.idbKeyval.createStore("mmix-programs", "programs")
+            self._files_store = js.idbKeyval.createStore("mmix-files", "files")
+        except Exception as e:
+            console.error(f"IndexedDB unavailable: {e}")
+        self.persistent = self._files_store is not None
+        # Awaited before the stores are first read
+        self._migrated = asyncio.ensure_future(self._migrate_local_storage())
+        # In-memory copies of both stores (JS Maps), loaded on first use
+        # and kept in sync on every write. The load futures are cached, so
+        # concurrent callers share one read of each store.
+        self._cache_loads = {}
+
+        # Auto-saves are debounced: rapid keystrokes are coalesced into one
+        # localStorage write once typing pauses for SAVE_DELAY_MS
+        self.SAVE_DELAY_MS = 300
+        self._pending_saves = {}
+        self._save_timer = None
+        self._flush_proxy = create_proxy(self.flush)
+
+    def _schedule_save(self, key, value):
+        """Queue an auto-save and restart the debounce timer"""
+        self._pending_saves[key] = value
+        if self._save_timer is not None:
+            js.clearTimeout(self._save_timer)
+        self._save_timer = js.setTimeout(self._flush_proxy, self.SAVE_DELAY_MS)
+
+    def flush(self, *args):
+        """Write pending auto-saves to localStorage now"""
+        if self._save_timer is not None:
+            js.clearTimeout(self._save_timer)
+            self._save_timer = None
+        pending, self._pending_saves = self._pending_saves, {}
+        for key, value in pending.items():
+            try:
+                localStorage.setItem(key, value)
+            except Exception as e:
+                console.error(f"Error saving {key}: {e}")
 
     def save_current_code(self, code):
         """Auto-save current code"""
-        try:
-            localStorage.setItem(self.CURRENT_CODE_KEY, code)
-        except Exception as e:
-            console.error(f"Error saving current code: {e}")
+        self._schedule_save(self.CURRENT_CODE_KEY, code)
 
     def load_current_code(self):
         """Load auto-saved code"""
         try:
-            code = localStorage.getItem(self.CURRENT_CODE_KEY)
+            code = self._pending_saves.get(self.CURRENT_CODE_KEY)
+            if code is None:
+                code = localStorage.getItem(self.CURRENT_CODE_KEY)
             return code if code else ""
         except Exception as e:
             console.error(f"Error loading current code: {e}")
@@ -31,102 +90,150 @@ class StorageManager:
 
     def save_current_args(self, args):
         """Auto-save current arguments"""
-        try:
-            localStorage.setItem(self.CURRENT_ARGS_KEY, args)
-        except Exception as e:
-            console.error(f"Error saving current args: {e}")
+        self._schedule_save(self.CURRENT_ARGS_KEY, args)
 
     def load_current_args(self):
         """Load auto-saved arguments"""
         try:
-            args = localStorage.getItem(self.CURRENT_ARGS_KEY)
+            args = self._pending_saves.get(self.CURRENT_ARGS_KEY)
+            if args is None:
+                args = localStorage.getItem(self.CURRENT_ARGS_KEY)
             return args if args else ""
         except Exception as e:
             console.error(f"Error loading current args: {e}")
             return ""
 
-    def save_program(self, name, code):
+    def save_current_stdin(self, stdin):
+        """Auto-save current standard input"""
+        self._schedule_save(self.CURRENT_STDIN_KEY, stdin)
+
+    def load_current_stdin(self):
+        """Load auto-saved standard input"""
+        try:
+            stdin = self._pending_saves.get(self.CURRENT_STDIN_KEY)
+            if stdin is None:
+                stdin = localStorage.getItem(self.CURRENT_STDIN_KEY)
+            return stdin if stdin else ""
+        except Exception as e:
+            console.error(f"Error loading current stdin: {e}")
+            return ""
+
+    async def _migrate_local_storage(self):
+        """Move programs and files saved in localStorage to IndexedDB"""
+        if not self.persistent:
+            return
+        # (store, JSON list key, value field)
+        legacy = [
+            (self._programs_store, "mmix.programs", "code"),
+            (self._files_store, "mmix.uploadedFiles", "content")
+        ]
+        for store, list_key, value_field in legacy:
+            try:
+                list_json = localStorage.getItem(list_key)
+                if not list_json:
+                    continue
+                entries = [[item["name"], item[value_field]] for item in json.loads(list_json)]
+                await js.idbKeyval.setMany(to_js(entries), store)
+                localStorage.removeItem(list_key)
+                console.log(f"Moved {len(entries)} items from {list_key} to IndexedDB")
+            except Exception as e:
+                console.error(f"Error migrating {list_key}: {e}")
+
+    async def _load_cache(self, store):
+        """Read a whole IndexedDB store into a JS Map of name -> content"""
+        await self._migrated
+        if not self.persistent:
+            return js.Map.new()
+        try:
+            return js.Map.new(await js.idbKeyval.entries(store))
+        except Exception as e:
+            console.error(f"Error reading IndexedDB: {e}")
+            return None
+
+    async def _cache(self, name, store):
+        """Get the cached Map of a store, loading it on first use"""
+        load = self._cache_loads.get(name)
+        if load is None:
+            load = self._cache_loads[name] = asyncio.ensure_future(self._load_cache(store))
+        cache = await load
+        if cache is None:
+            # The read failed; the next call tries again
+            if self._cache_loads.get(name) is load:
+                del self._cache_loads[name]
+            return js.Map.new()
+        return cache
+
+    async def _programs(self):
+        """Get the cached programs Map, loading it on first use"""
+        return await self._cache("programs", self._programs_store)
+
+    async def _files(self):
+        """Get the cached uploaded files Map, loading it on first use"""
+        return await self._cache("files", self._files_store)
+
+    async def save_program(self, name, code):
         """Save a named program"""
+        programs = await self._programs()
         try:
-            programs = self.get_programs()
-            # Update if exists, otherwise add
-            found = False
-            for prog in programs:
-                if prog["name"] == name:
-                    prog["code"] = code
-                    prog["timestamp"] = js.Date.now()
-                    found = True
-                    break
-            if not found:
-                programs.append({
-                    "name": name,
-                    "code": code,
-                    "timestamp": js.Date.now()
-                })
-            localStorage.setItem(self.PROGRAMS_KEY, json.dumps(programs))
+            if self.persistent:
+                await js.idbKeyval.set(name, code, self._programs_store)
+            programs.set(name, code)
             return True
         except Exception as e:
             console.error(f"Error saving program: {e}")
             return False
 
-    def get_programs(self):
-        """Get all saved programs"""
-        try:
-            programs_json = localStorage.getItem(self.PROGRAMS_KEY)
-            if programs_json:
-                return json.loads(programs_json)
-            return []
-        except Exception as e:
-            console.error(f"Error getting programs: {e}")
-            return []
+    async def get_program_names(self):
+        """Get the names of all saved programs"""
+        return list((await self._programs()).keys())
 
-    def delete_program(self, name):
+    async def get_program(self, name):
+        """Get the code of a saved program, or None if it does not exist"""
+        return (await self._programs()).get(name)
+
+    async def get_programs(self):
+        """Get all saved programs as a JS Map of name -> code"""
+        return await self._programs()
+
+    async def delete_program(self, name):
         """Delete a saved program"""
+        programs = await self._programs()
         try:
-            programs = self.get_programs()
-            programs = [p for p in programs if p["name"] != name]
-            localStorage.setItem(self.PROGRAMS_KEY, json.dumps(programs))
+            if self.persistent:
+                await getattr(js.idbKeyval, "del")(name, self._programs_store)
+            programs.delete(name)
             return True
         except Exception as e:
             console.error(f"Error deleting program: {e}")
             return False
 
-    def save_uploaded_file(self, filename, content):
-        """Save an uploaded file"""
+    async def save_uploaded_file(self, filename, content):
+        """Save an uploaded file (a Uint8Array)"""
+        files = await self._files()
         try:
-            files = self.get_uploaded_files()
-            # Update if exists, otherwise add
-            found = False
-            for f in files:
-                if f["name"] == filename:
-                    f["content"] = content
-                    found = True
-                    break
-            if not found:
-                files.append({"name": filename, "content": content})
-            localStorage.setItem(self.FILES_KEY, json.dumps(files))
+            if self.persistent:
+                await js.idbKeyval.set(filename, content, self._files_store)
+            files.set(filename, content)
             return True
         except Exception as e:
             console.error(f"Error saving uploaded file: {e}")
             return False
 
-    def get_uploaded_files(self):
-        """Get all uploaded files"""
-        try:
-            files_json = localStorage.getItem(self.FILES_KEY)
-            if files_json:
-                return json.loads(files_json)
-            return []
-        except Exception as e:
-            console.error(f"Error getting uploaded files: {e}")
-            return []
+    async def get_uploaded_file_names(self):
+        """Get the names of all uploaded files"""
+        return list((await self._files()).keys())
 
-    def delete_uploaded_file(self, filename):
+    async def get_uploaded_files(self):
+        """Get all uploaded files as a JS Map of name -> Uint8Array"""
+        return await self._files()
+
+    async def delete_uploaded_file(self, filename):
         """Delete an uploaded file"""
+        files = await self._files()
         try:
-            files = self.get_uploaded_files()
-            files = [f for f in files if f["name"] != filename]
-            localStorage.setItem(self.FILES_KEY, json.dumps(files))
+            if self.persistent:
+                await getattr(js.idbKeyval, "del")(filename, self._files_store)
+            files.delete(filename)
             return True
         except Exception as e:
             console.error(f"Error deleting uploaded file: {e}")
@@ -136,53 +243,272 @@ class MMIXPlayground:
     """Main class for the MMIX Interactive Playground"""
 
     def __init__(self):
-        self.mmixal_factory = None
-        self.mmix_factory = None
-        self.object_code = None
-        self.examples = {}
+        # Handlers start their coroutines with create_task on this loop
+        self._loop = asyncio.get_event_loop()
+        self.worker = None
+        self.modules_ready = False
+        # The object code itself stays in MMIXWorkerClient.objectCode
+        self.has_object_code = False
+        self._pending_listing = None
+        # Parsed JS object, created on first use; entries are converted
+        # to Python one at a time
+        self._examples = None
+        # Rows of each modal list by list id, as key -> row
+        self._list_rows = {}
+        # Arguments for the usual run without user args; the worker only
+        # receives a copy, so one array serves every run
+        self._no_args = js.Array.new()
         self.storage = StorageManager()
+        self.debug = DEBUG
 
         console.log("Initializing MMIX Playground...")
-        self.load_examples()
+        self.install_zero_delay_scheduler()
+        self.start_worker()
         self.setup_ui()
         self.restore_code()
-        asyncio.ensure_future(self.load_modules_async())
+        if not self.storage.persistent:
+            self.show_error(STORAGE_WARNING)
+        self._loop.create_task(self.load_modules_async())
+
+    def _dlog(self, *args):
+        """console.log, only when debug tracing is enabled"""
+        if self.debug:
+            console.log(*args)
+
+    def install_zero_delay_scheduler(self):
+        """Run zero-delay asyncio callbacks via MessageChannel, not setTimeout"""
+        # Pyodide's WebLoop schedules call_soon through setTimeout(0), which
+        # browsers clamp to 4 ms once timeouts nest; every await in the
+        # assemble/run coroutines would pay that clamp
+        js.eval("""
+            window.mmixZeroTimeout = (function() {
+                const queue = [];
+                const channel = new MessageChannel();
+                channel.port1.onmessage = () => queue.shift()();
+                return function(callback) {
+                    queue.push(callback);
+                    channel.port2.postMessage('');
+                };
+            })();
+        """)
 
-    def load_examples(self):
-        """Load example programs from embedded JSON"""
+        loop = self._loop
+        call_later = loop.call_later
+
+        def call_later_fast(delay, callback, *args, context=None):
+            if delay > 0:
+                return call_later(delay, callback, *args, context=context)
+            handle = asyncio.Handle(callback, args, loop, context=context)
+
+            def run_handle():
+                if not handle.cancelled():
+                    handle._run()
+
+            js.mmixZeroTimeout(create_once_callable(run_handle))
+            return handle
+
+        loop.call_later = call_later_fast
+
+    def register_service_worker(self):
+        """Register sw.js, which caches the MMIX modules across reloads"""
         try:
-            examples_script = document.getElementById("example-programs")
-            if examples_script:
-                self.examples = json.loads(examples_script.textContent)
-                console.log(f"Loaded {len(self.examples)} example programs")
+            if hasattr(js.navigator, "serviceWorker"):
+                js.navigator.serviceWorker.register(f"sw.js?v={MODULES_VERSION}").catch(
+                    lambda e: console.error(f"Service worker registration failed: {e}"))
         except Exception as e:
-            console.error(f"Error loading examples: {e}")
+            console.error(f"Error registering service worker: {e}")
+
+    def start_worker(self):
+        """Start the MMIX worker so module downloads overlap UI setup"""
+        self.register_service_worker()
+
+        js.eval("""
+            window.MMIXWorkerClient = class {
+                constructor(url) {
+                    this.url = url;
+                    this.pending = new Map();
+                    this.nextId = 0;
+                    this.start();
+                }
+
+                start() {
+                    // A new worker has not seen the object code yet
+                    this.workerHasObjectCode = false;
+                    this.ready = new Promise((resolve, reject) => {
+                        this.readyCallbacks = { resolve, reject };
+                    });
+                    this.ready.catch(() => {});  // Reported through call()
+                    this.worker = new Worker(this.url, { type: 'module' });
+                    this.worker.onmessage = (event) => this.onMessage(event.data);
+                    this.worker.onerror = (event) => {
+                        this.failAll(new Error(event.message || 'MMIX worker failed'));
+                    };
+                }
+
+                onMessage(message) {
+                    if (message.type === 'ready') {
+                        if (message.error) {
+                            this.readyCallbacks.reject(new Error(message.error));
+                        } else {
+                            this.readyCallbacks.resolve();
+                        }
+                        return;
+                    }
+                    const request = this.pending.get(message.id);
+                    if (!request) {
+                        return;
+                    }
+                    this.pending.delete(message.id);
+                    if (message.error) {
+                        request.reject(new Error(message.error));
+                    } else {
+                        request.resolve(message);
+                    }
+                }
+
+                call(message) {
+                    return this.ready.then(() => new Promise((resolve, reject) => {
+                        const id = this.nextId++;
+                        this.pending.set(id, { resolve, reject });
+                        this.worker.postMessage({ ...message, id });
+                    }));
+                }
+
+                assemble(source) {
+                    return this.call({ type: 'assemble', source }).then((reply) => {
+                        // The worker keeps its own copy for run(); this one never
+                        // crosses into Python and is only sent again to a
+                        // restarted worker
+                        this.objectCode = reply.objectCode;
+                        this.workerHasObjectCode = true;
+                        return {
+                            exitCode: reply.exitCode,
+                            listing: reply.listing,
+                            consoleOutput: reply.consoleOutput,
+                            objectCodeLength: reply.objectCode.length
+                        };
+                    });
+                }
+
+                run(args, stdin, files, programs) {
+                    const objectCode = this.workerHasObjectCode ? null : this.objectCode;
+                    this.workerHasObjectCode = true;
+                    return this.call({ type: 'run', objectCode, args, stdin, files, programs });
+                }
+
+                get busy() {
+                    return this.pending.size > 0;
+                }
+
+                failAll(error) {
+                    this.readyCallbacks.reject(error);
+                    for (const request of this.pending.values()) {
+                        request.reject(error);
+                    }
+                    this.pending.clear();
+                }
+
+                restart(reason) {
+                    // Terminating is the only way to interrupt a running callMain
+                    this.worker.terminate();
+                    this.failAll(new Error(reason));
+                    this.start();
+                }
+            };
+        """)
+
+        # The worker starts downloading and compiling both modules at once
+        self.worker = js.MMIXWorkerClient.new(f"mmix-worker.js?v={MODULES_VERSION}")
+
+    def load_examples(self):
+        """Get the example programs, parsing the embedded JSON on first use"""
+        # Deferred until the Files modal opens or the default example is
+        # needed, so a large catalog does not delay startup
+        if self._examples is None:
+            try:
+                examples_script = document.getElementById("example-programs")
+                if examples_script:
+                    # Native JSON.parse; only the example being loaded is
+                    # converted to a Python dict
+                    self._examples = js.JSON.parse(examples_script.textContent)
+                    console.log(f"Loaded {js.Object.keys(self._examples).length} example programs")
+            except Exception as e:
+                console.error(f"Error loading examples: {e}")
+        return self._examples
+
+    def get_example(self, key):
+        """Get an example program as a dict, or None if it does not exist"""
+        examples = self.load_examples()
+        if examples is None or not js.Object.hasOwn(examples, key):
+            return None
+        return js.Reflect.get(examples, key).to_py()
+
+    def get_example_names(self):
+        """Get (key, name) pairs for all example programs"""
+        examples = self.load_examples()
+        if examples is None:
+            return []
+        return [(entry[0], entry[1].name) for entry in js.Object.entries(examples)]
 
     def setup_ui(self):
         """Set up UI event handlers"""
+        # Elements used by the event handlers, looked up once
+        self.el = types.SimpleNamespace(
+            code_editor=document.getElementById("code-editor"),
+            listing=document.getElementById("listing-output"),
+            sim=document.getElementById("simulation-output"),
+            err=document.getElementById("error-output"),
+            assemble_run_btn=document.getElementById("assemble-run-btn"),
+            assemble_btn=document.getElementById("assemble-btn"),
+            run_btn=document.getElementById("run-btn"),
+            stop_btn=document.getElementById("stop-btn"),
+            args_input=document.getElementById("args-input"),
+            args_display=document.getElementById("args-display"),
+            args_display_value=document.getElementById("args-display-value"),
+            save_name_input=document.getElementById("save-name-input"),
+            stdin_input=document.getElementById("stdin-input"),
+            # A Python list, so iterating it does not go back to the NodeList
+            tabs=list(document.querySelectorAll(".tab"))
+        )
+        self._panes = {
+            "listing": self.el.listing,
+            "output": self.el.sim,
+            "errors": self.el.err
+        }
+        self._tab_buttons = {tab.getAttribute("data-tab"): tab for tab in self.el.tabs}
+        # Matches the tab marked active in index.html
+        self._active_tab = "listing"
+
         # Assemble & Run button
-        assemble_run_btn = document.getElementById("assemble-run-btn")
-        assemble_run_btn.onclick = create_proxy(self.on_assemble_run_click)
+        self.el.assemble_run_btn.onclick = create_proxy(self.on_assemble_run_click)
 
         # Assemble button
-        assemble_btn = document.getElementById("assemble-btn")
-        assemble_btn.onclick = create_proxy(self.on_assemble_click)
+        self.el.assemble_btn.onclick = create_proxy(self.on_assemble_click)
 
         # Run button
-        run_btn = document.getElementById("run-btn")
-        run_btn.onclick = create_proxy(self.on_run_click)
+        self.el.run_btn.onclick = create_proxy(self.on_run_click)
+
+        # Stop button
+        self.el.stop_btn.onclick = create_proxy(self.on_stop_click)
 
         # Tab switching
-        tabs = document.querySelectorAll(".tab")
-        for tab in tabs:
+        for tab in self.el.tabs:
             tab.onclick = create_proxy(self.on_tab_click)
 
-        # Keyboard shortcut: Ctrl-Enter to assemble & run
-        code_editor = document.getElementById("code-editor")
+        # Keyboard shortcut: Ctrl-Enter (or Cmd-Enter on Mac) to assemble & run
+        code_editor = self.el.code_editor
         code_editor.onkeydown = create_proxy(self.on_editor_keydown)
 
-        # Auto-save on code changes
+        # Auto-save on code changes; pending saves are written out when
+        # the editor loses focus or the page is hidden or closed. Mobile
+        # browsers and bfcache navigations may skip beforeunload, but they
+        # still fire pagehide and visibilitychange.
         code_editor.oninput = create_proxy(self.on_code_change)
+        flush_saves = create_proxy(self.storage.flush)
+        code_editor.onblur = flush_saves
+        js.window.addEventListener("beforeunload", flush_saves)
+        js.window.addEventListener("pagehide", flush_saves)
+        document.addEventListener("visibilitychange", create_proxy(self.on_visibility_change))
 
         # Files button
         document.getElementById("files-btn").onclick = create_proxy(self.on_files_click)
@@ -194,23 +520,53 @@ class MMIXPlayground:
         document.getElementById("args-done-btn").onclick = create_proxy(self.on_args_done)
         document.getElementById("args-clear-btn").onclick = create_proxy(self.on_args_clear)
         document.getElementById("args-assemble-run-btn").onclick = create_proxy(self.on_args_assemble_run)
-        args_input = document.getElementById("args-input")
+        args_input = self.el.args_input
         args_input.oninput = create_proxy(self.on_args_change)
+        args_input.onblur = flush_saves
+        self.el.stdin_input.oninput = create_proxy(self.on_stdin_change)
+        self.el.stdin_input.onblur = flush_saves
+
+        # Modal lists: one delegated click listener per list, dispatching
+        # on the data-action of the clicked button
+        self._list_actions = {
+            "programs-list": {"load": self.load_program, "delete": self.delete_program},
+            "examples-list": {"load": self.load_example},
+            "data-files-list": {"delete": self.delete_file}
+        }
+        on_list_click = create_proxy(self.on_list_click)
+        for list_id in self._list_actions:
+            document.getElementById(list_id).addEventListener("click", on_list_click)
 
         # File tabs
-        file_tabs = document.querySelectorAll(".file-tab")
+        file_tabs = list(document.querySelectorAll(".file-tab"))
         for tab in file_tabs:
             tab.onclick = create_proxy(self.on_file_tab_click)
+        self._file_tab_buttons = {tab.getAttribute("data-tab"): tab for tab in file_tabs}
+        self._file_panes = {
+            "programs": document.getElementById("programs-pane"),
+            "examples": document.getElementById("examples-pane"),
+            "data": document.getElementById("data-pane")
+        }
+        # Matches the file tab marked active in index.html
+        self._active_file_tab = "programs"
 
         # Save/Import/Export buttons
         document.getElementById("save-confirm-btn").onclick = create_proxy(self.on_save_confirm)
         document.getElementById("import-btn").onclick = create_proxy(self.on_import_click)
         document.getElementById("export-btn").onclick = create_proxy(self.on_export_click)
         document.getElementById("import-file-input").onchange = create_proxy(self.on_import_file_selected)
+        # One reader per input, with a single onload handler each; the
+        # name of the file being read is kept alongside
+        self._import_reader = js.FileReader.new()
+        self._import_reader.onload = create_proxy(self.on_import_file_loaded)
+        self._import_name = None
 
         # Data file upload
         document.getElementById("upload-file-btn").onclick = create_proxy(self.on_upload_file_click)
         document.getElementById("upload-data-file-input").onchange = create_proxy(self.on_data_file_selected)
+        self._data_reader = js.FileReader.new()
+        self._data_reader.onload = create_proxy(self.on_data_file_loaded)
+        self._data_name = None
 
         console.log("UI event handlers set up")
 
@@ -218,36 +574,52 @@ class MMIXPlayground:
         """Restore saved code from localStorage or load default example"""
         saved_code = self.storage.load_current_code()
         if saved_code:
-            document.getElementById("code-editor").value = saved_code
+            self.el.code_editor.value = saved_code
             console.log("Restored code from localStorage")
-        elif "hello" in self.examples:
+        else:
             # Load hello example by default
-            document.getElementById("code-editor").value = self.examples["hello"]["code"]
-            console.log("Loaded default hello example")
+            hello = self.get_example("hello")
+            if hello:
+                self.el.code_editor.value = hello["code"]
+                console.log("Loaded default hello example")
 
         # Restore args
         saved_args = self.storage.load_current_args()
         if saved_args:
-            document.getElementById("args-input").value = saved_args
+            self.el.args_input.value = saved_args
             self.update_args_display()
             console.log("Restored args from localStorage")
 
+        # Restore standard input
+        saved_stdin = self.storage.load_current_stdin()
+        if saved_stdin:
+            self.el.stdin_input.value = saved_stdin
+
+    def on_visibility_change(self, event):
+        """Write pending auto-saves when the page is hidden"""
+        if document.visibilityState == "hidden":
+            self.storage.flush()
+
     def on_code_change(self, event):
         """Handle code editor changes - auto-save"""
-        code = document.getElementById("code-editor").value
+        code = self.el.code_editor.value
         self.storage.save_current_code(code)
 
     def on_args_change(self, event):
         """Handle args input changes - auto-save and update display"""
-        args = document.getElementById("args-input").value
+        args = self.el.args_input.value
         self.storage.save_current_args(args)
         self.update_args_display()
 
+    def on_stdin_change(self, event):
+        """Handle standard input changes - auto-save"""
+        self.storage.save_current_stdin(self.el.stdin_input.value)
+
     def update_args_display(self):
         """Update the args display row visibility and content"""
-        args = document.getElementById("args-input").value.strip()
-        args_display = document.getElementById("args-display")
-        args_display_value = document.getElementById("args-display-value")
+        args = self.el.args_input.value.strip()
+        args_display = self.el.args_display
+        args_display_value = self.el.args_display_value
 
         if args:
             args_display_value.value = args
@@ -264,10 +636,11 @@ class MMIXPlayground:
         self.hide_modal("args-modal")
 
     def on_args_clear(self, event):
-        """Clear the args input"""
-        args_input = document.getElementById("args-input")
-        args_input.value = ""
+        """Clear the args and standard input"""
+        self.el.args_input.value = ""
         self.storage.save_current_args("")
+        self.el.stdin_input.value = ""
+        self.storage.save_current_stdin("")
         self.update_args_display()
 
     def on_args_assemble_run(self, event):
@@ -277,48 +650,54 @@ class MMIXPlayground:
 
     def on_files_click(self, event):
         """Show files modal with all tabs"""
-        self.populate_programs_list()
-        self.populate_examples_list()
-        self.populate_data_files_list()
-        self.show_modal("files-modal")
+        self._loop.create_task(self._do_show_files())
+
+    async def _do_show_files(self):
+        """Populate all file lists, then show the files modal"""
+        # Build all three lists off-document first, then swap them in and
+        # open the modal together in the next frame, so the modal is laid
+        # out and painted once
+        programs = await self.build_programs_list()
+        examples = self.build_examples_list()
+        data_files = await self.build_data_files_list()
+
+        def commit(timestamp):
+            self._replace_list("programs-list", programs)
+            self._replace_list("examples-list", examples)
+            self._replace_list("data-files-list", data_files)
+            self.show_modal("files-modal")
+
+        js.requestAnimationFrame(create_once_callable(commit))
 
     def on_file_tab_click(self, event):
         """Handle file tab switching"""
         tab_name = event.target.getAttribute("data-tab")
+        if tab_name == self._active_file_tab:
+            return
 
-        # Update tabs
-        tabs = document.querySelectorAll(".file-tab")
-        for tab in tabs:
-            if tab.getAttribute("data-tab") == tab_name:
-                tab.classList.add("active")
-            else:
-                tab.classList.remove("active")
-
-        # Update panes
-        panes = {
-            "programs": document.getElementById("programs-pane"),
-            "examples": document.getElementById("examples-pane"),
-            "data": document.getElementById("data-pane")
-        }
-
-        for name, pane in panes.items():
-            if name == tab_name:
-                pane.classList.add("active")
-            else:
-                pane.classList.remove("active")
+        # Only the previously active and the new tab and pane change
+        self._file_tab_buttons[self._active_file_tab].className = "file-tab"
+        self._file_panes[self._active_file_tab].className = "file-pane"
+        self._file_tab_buttons[tab_name].className = "file-tab active"
+        self._file_panes[tab_name].className = "file-pane active"
+        self._active_file_tab = tab_name
 
     def on_save_confirm(self, event):
         """Save current code with specified name"""
-        name = document.getElementById("save-name-input").value.strip()
+        name = self.el.save_name_input.value.strip()
         if not name:
             self.show_error("Please enter a program name")
             return
 
-        code = document.getElementById("code-editor").value
-        if self.storage.save_program(name, code):
+        code = self.el.code_editor.value
+        self._loop.create_task(self._do_save_program(name, code))
+
+    async def _do_save_program(self, name, code):
+        """Async save handler"""
+        if await self.storage.save_program(name, code):
             self.show_status(f"Saved program '{name}'", "success")
-            document.getElementById("save-name-input").value = ""
-            self.populate_programs_list()
+            self.el.save_name_input.value = ""
+            await self.populate_programs_list()
         else:
             self.show_error("Failed to save program")
 
@@ -328,7 +707,7 @@ class MMIXPlayground:
 
     def on_export_click(self, event):
         """Export current code as .mms file"""
-        code = document.getElementById("code-editor").value
+        code = self.el.code_editor.value
         if not code.strip():
             self.show_error("No code to export")
             return
@@ -353,16 +732,17 @@ class MMIXPlayground:
             return
 
         file = files.item(0)  # Use .item() for JsProxy arrays
-        reader = js.FileReader.new()
-
-        def on_load(e):
-            code = e.target.result
-            document.getElementById("code-editor").value = code
-            self.storage.save_current_code(code)
-            self.show_status(f"Imported {file.name}", "success")
-
-        reader.onload = create_proxy(on_load)
-        reader.readAsText(file)
+        if self._import_reader.readyState == js.FileReader.LOADING:
+            self._import_reader.abort()
+        self._import_name = file.name
+        self._import_reader.readAsText(file)
+
+    def on_import_file_loaded(self, event):
+        """Put an imported file into the editor"""
+        code = event.target.result
+        self.el.code_editor.value = code
+        self.storage.save_current_code(code)
+        self.show_status(f"Imported {self._import_name}", "success")
 
     def on_upload_file_click(self, event):
         """Trigger data file upload"""
@@ -375,125 +755,173 @@ class MMIXPlayground:
             return
 
         file = files.item(0)  # Use .item() for JsProxy arrays
-        reader = js.FileReader.new()
-
-        def on_load(e):
-            content = e.target.result
-            if self.storage.save_uploaded_file(file.name, content):
-                self.show_status(f"Uploaded {file.name}", "success")
-                self.populate_data_files_list()
-            else:
-                self.show_error(f"Failed to upload {file.name}")
-
-        reader.onload = create_proxy(on_load)
-        reader.readAsText(file)
-
-
-    def populate_programs_list(self):
-        """Populate the programs list in load modal"""
-        programs = self.storage.get_programs()
-        list_div = document.getElementById("programs-list")
-
-        if len(programs) == 0:
-            list_div.innerHTML = "<p>No saved programs yet.</p>"
-            return
+        if self._data_reader.readyState == js.FileReader.LOADING:
+            self._data_reader.abort()
+        self._data_name = file.name
+        self._data_reader.readAsArrayBuffer(file)
+
+    def on_data_file_loaded(self, event):
+        """Store an uploaded data file"""
+        # Raw bytes: no text decoding here, and MEMFS takes them as is
+        content = js.Uint8Array.new(event.target.result)
+        self._loop.create_task(self._do_save_uploaded_file(self._data_name, content))
+
+    async def _do_save_uploaded_file(self, name, content):
+        """Async data file upload handler"""
+        if await self.storage.save_uploaded_file(name, content):
+            self.show_status(f"Uploaded {name}", "success")
+            await self.populate_data_files_list()
+        else:
+            self.show_error(f"Failed to upload {name}")
+
+
+    def _build_list(self, empty_text, item_kind, items):
+        """Build the rows of a modal list, one per (key, label, actions) item
+
+        Rows are built with createElement into a DocumentFragment, so the
+        HTML parser is never involved and names are only ever set as
+        textContent. actions is a list of (button label, action) pairs;
+        each button carries its action and the row key in data-
+        attributes for on_list_click. Returns the fragment and a dict of
+        key -> row, ready for _replace_list.
+        """
+        frag = document.createDocumentFragment()
+        rows = {}
+        if len(items) == 0:
+            empty = document.createElement("p")
+            empty.textContent = empty_text
+            frag.appendChild(empty)
+            return frag, rows
+
+        for key, label, actions in items:
+            item = document.createElement("div")
+            item.className = f"{item_kind}-item"
+            name_span = document.createElement("span")
+            name_span.className = f"{item_kind}-name"
+            name_span.textContent = label
+            actions_div = document.createElement("div")
+            actions_div.className = f"{item_kind}-actions"
+            for button_label, action in actions:
+                button = document.createElement("button")
+                button.className = "btn btn-small"
+                button.textContent = button_label
+                button.dataset.action = action
+                button.dataset.key = key
+                actions_div.appendChild(button)
+            item.append(name_span, actions_div)
+            frag.appendChild(item)
+            rows[key] = item
+
+        return frag, rows
+
+    def _replace_list(self, list_id, built):
+        """Swap a built (fragment, rows) pair into a modal list"""
+        frag, rows = built
+        self._list_rows[list_id] = rows
+        document.getElementById(list_id).replaceChildren(frag)
+
+    def _remove_list_row(self, list_id, key):
+        """Remove one row from a modal list
+
+        Returns False if the row is not shown or was the last one, in
+        which case the list has to be rebuilt.
+        """
+        rows = self._list_rows.get(list_id, {})
+        if key not in rows or len(rows) == 1:
+            return False
+        rows.pop(key).remove()
+        return True
 
-        html_parts = []
-        for prog in programs:
-            name = prog["name"]
-            display_name = f"{name}.mms"  # Show with extension
-            html_parts.append(f'''
-                <div class="program-item">
-                    <span class="program-name">{display_name}</span>
-                    <div class="program-actions">
-                        <button class="btn btn-small" onclick="playground.load_program('{name}')">Load</button>
-                        <button class="btn btn-small" onclick="playground.delete_program('{name}')">Delete</button>
-                    </div>
-                </div>
-            ''')
-
-        list_div.innerHTML = "".join(html_parts)
-
-    def populate_examples_list(self):
-        """Populate the examples list"""
-        list_div = document.getElementById("examples-list")
-
-        if len(self.examples) == 0:
-            list_div.innerHTML = "<p>No examples available.</p>"
+    def on_list_click(self, event):
+        """Handle a button click in one of the modal lists"""
+        button = event.target.closest("button[data-action]")
+        if button is None:
             return
+        handlers = self._list_actions[event.currentTarget.id]
+        handlers[button.dataset.action](button.dataset.key)
+
+    async def build_programs_list(self):
+        """Build the programs list in load modal"""
+        names = await self.storage.get_program_names()
+        return self._build_list("No saved programs yet.", "program", [
+            # Show with extension
+            (name, f"{name}.mms", [("Load", "load"), ("Delete", "delete")])
+            for name in names
+        ])
+
+    def build_examples_list(self):
+        """Build the examples list"""
+        return self._build_list("No examples available.", "program", [
+            (key, name, [("Load", "load")])
+            for key, name in self.get_example_names()
+        ])
+
+    async def build_data_files_list(self):
+        """Build the uploaded data files list"""
+        names = await self.storage.get_uploaded_file_names()
+        return self._build_list("No uploaded files yet.", "file", [
+            (name, name, [("Delete", "delete")])
+            for name in names
+        ])
+
+    async def populate_programs_list(self):
+        """Populate the programs list in load modal"""
+        self._replace_list("programs-list", await self.build_programs_list())
 
-        html_parts = []
-        for key, example in self.examples.items():
-            name = example["name"]
-            html_parts.append(f'''
-                <div class="program-item">
-                    <span class="program-name">{name}</span>
-                    <div class="program-actions">
-                        <button class="btn btn-small" onclick="playground.load_example('{key}')">Load</button>
-                    </div>
-                </div>
-            ''')
-
-        list_div.innerHTML = "".join(html_parts)
-
-    def populate_data_files_list(self):
+    async def populate_data_files_list(self):
         """Populate the uploaded data files list"""
-        files = self.storage.get_uploaded_files()
-        list_div = document.getElementById("data-files-list")
+        self._replace_list("data-files-list", await self.build_data_files_list())
 
-        if len(files) == 0:
-            list_div.innerHTML = "<p>No uploaded files yet.</p>"
+    def load_program(self, name):
+        """Load a saved program (called from the modal lists)"""
+        self._loop.create_task(self._do_load_program(name))
+
+    async def _do_load_program(self, name):
+        """Async program load handler"""
+        code = await self.storage.get_program(name)
+        if code is None:
+            self.show_error(f"Program '{name}' not found")
             return
 
-        html_parts = []
-        for f in files:
-            name = f["name"]
-            html_parts.append(f'''
-                <div class="file-item">
-                    <span class="file-name">{name}</span>
-                    <div class="file-actions">
-                        <button class="btn btn-small" onclick="playground.delete_file('{name}')">Delete</button>
-                    </div>
-                </div>
-            ''')
-
-        list_div.innerHTML = "".join(html_parts)
-
-    def load_program(self, name):
-        """Load a saved program (called from JavaScript)"""
-        programs = self.storage.get_programs()
-        for prog in programs:
-            if prog["name"] == name:
-                document.getElementById("code-editor").value = prog["code"]
-                self.storage.save_current_code(prog["code"])
-                self.hide_modal("files-modal")
-                self.show_status(f"Loaded program '{name}'", "success")
-                return
-
-        self.show_error(f"Program '{name}' not found")
+        self.el.code_editor.value = code
+        self.storage.save_current_code(code)
+        self.hide_modal("files-modal")
+        self.show_status(f"Loaded program '{name}'", "success")
 
     def load_example(self, key):
-        """Load an example program (called from JavaScript)"""
-        if key in self.examples:
-            document.getElementById("code-editor").value = self.examples[key]["code"]
-            self.storage.save_current_code(self.examples[key]["code"])
+        """Load an example program (called from the modal lists)"""
+        example = self.get_example(key)
+        if example:
+            self.el.code_editor.value = example["code"]
+            self.storage.save_current_code(example["code"])
             self.hide_modal("files-modal")
-            self.show_status(f"Loaded example: {self.examples[key]['name']}", "success")
+            self.show_status(f"Loaded example: {example['name']}", "success")
         else:
             self.show_error(f"Example '{key}' not found")
 
     def delete_program(self, name):
-        """Delete a saved program (called from JavaScript)"""
-        if self.storage.delete_program(name):
-            self.populate_programs_list()
+        """Delete a saved program (called from the modal lists)"""
+        self._loop.create_task(self._do_delete_program(name))
+
+    async def _do_delete_program(self, name):
+        """Async program delete handler"""
+        if await self.storage.delete_program(name):
+            # Only the deleted row changes, unless the list becomes empty
+            if not self._remove_list_row("programs-list", name):
+                await self.populate_programs_list()
             self.show_status(f"Deleted program '{name}'", "success")
         else:
             self.show_error(f"Failed to delete program '{name}'")
 
     def delete_file(self, name):
-        """Delete an uploaded file (called from JavaScript)"""
-        if self.storage.delete_uploaded_file(name):
-            self.populate_data_files_list()
+        """Delete an uploaded file (called from the modal lists)"""
+        self._loop.create_task(self._do_delete_file(name))
+
+    async def _do_delete_file(self, name):
+        """Async file delete handler"""
+        if await self.storage.delete_uploaded_file(name):
+            if not self._remove_list_row("data-files-list", name):
+                await self.populate_data_files_list()
             self.show_status(f"Deleted file '{name}'", "success")
         else:
             self.show_error(f"Failed to delete file '{name}'")
@@ -515,34 +943,24 @@ class MMIXPlayground:
             modal.classList.remove("show")
 
     async def load_modules_async(self):
-        """Load WASM module factories asynchronously"""
+        """Wait for the worker to load the WASM modules"""
         try:
             self.show_status("Loading MMIX modules...")
 
-            # Get base URL for loading modules
-            base_url = js.window.location.origin
-
-            # Load mmixal factory
-            console.log("Loading mmixal factory...")
-            mmixal_url = f"{base_url}/mmix/mmixal.js"
-            console.log(f"Loading from: {mmixal_url}")
-            mmixal_module_ns = await js.eval(f"import('{mmixal_url}')")
-            self.mmixal_factory = mmixal_module_ns.default
-            console.log("mmixal factory loaded")
-
-            # Load mmix factory
-            console.log("Loading mmix factory...")
-            mmix_url = f"{base_url}/mmix/mmix.js"
-            console.log(f"Loading from: {mmix_url}")
-            mmix_module_ns = await js.eval(f"import('{mmix_url}')")
-            self.mmix_factory = mmix_module_ns.default
-            console.log("mmix factory loaded")
+            # The downloads were started by start_worker
+            self._dlog("Waiting for MMIX worker...")
+            await self.worker.ready
+            self.modules_ready = True
+            self._dlog("mmixal and mmix modules loaded in worker")
 
             self.show_status("Modules loaded successfully!", "success")
-            self.show_error("Modules loaded and ready! Select an example or write your own MMIX code.")
+            ready_msg = "Modules loaded and ready! Select an example or write your own MMIX code."
+            if not self.storage.persistent:
+                ready_msg = f"{ready_msg}\n\n{STORAGE_WARNING}"
+            self.show_error(ready_msg)
 
             # Enable assemble button
-            document.getElementById("assemble-btn").disabled = False
+            self.el.assemble_btn.disabled = False
 
         except Exception as e:
             error_msg = f"Error loading modules: {e}"
@@ -551,250 +969,70 @@ class MMIXPlayground:
             self.show_status("Failed to load modules", "error")
 
     async def assemble(self, source_code):
-        """Assemble MMIX code and return results"""
+        """Assemble MMIX code in the worker and return results"""
         try:
-            # Create output array for capturing print
-            mmixal_output = []
-
-            # Create a fresh module instance
-            console.log("Creating fresh mmixal module instance...")
-            mmixal_config = to_js({
-                "print": create_proxy(lambda text: mmixal_output.append(str(text))),
-                "printErr": create_proxy(lambda text: mmixal_output.append(str(text))),
-                "noInitialRun": True
-            })
-            mmixal_module = await self.mmixal_factory(mmixal_config)
-            console.log(f"mmixal module instance created, type: {type(mmixal_module)}")
-
-            # Create virtual files in MEMFS
-            console.log(f"Writing source code ({len(source_code)} bytes) to /input.mms")
-            console.log(f"Source code preview: {source_code[:100] if len(source_code) > 100 else source_code}")
-            mmixal_module.FS.writeFile("/input.mms", source_code)
-
-            # Verify the file was written
-            input_stat = mmixal_module.FS.stat("/input.mms")
-            console.log(f"input.mms written, size: {input_stat.size}")
-
-            # Call mmixal with arguments
-            # mmixal -l /output.lst -o /output.mmo /input.mms
-            console.log("Calling mmixal...")
-            args = to_js([
-                "-l", "/output.lst",
-                "-o", "/output.mmo",
-                "/input.mms"
-            ])
-            exit_code = mmixal_module.callMain(args)
-
-            console.log(f"mmixal exit code: {exit_code}")
-            console.log(f"mmixal output captured: {mmixal_output}")
-
-            # Try to force close any open file descriptors
-            try:
-                # Get list of open streams
-                console.log("Checking for open streams...")
-                streams = mmixal_module.FS.streams
-                console.log(f"Number of streams: {len(streams) if streams else 0}")
-                if streams:
-                    for stream in streams:
-                        if stream and hasattr(stream, 'fd') and stream.fd > 2:  # Skip stdin/stdout/stderr
-                            console.log(f"Closing stream fd={stream.fd}")
-                            try:
-                                mmixal_module.FS.close(stream)
-                            except:
-                                pass
-            except Exception as e:
-                console.error(f"Error closing streams: {e}")
-
-            # List files in root directory and check their stats
-            try:
-                files = mmixal_module.FS.readdir("/")
-                console.log(f"Files in /: {files}")
-
-                # Check file stats for output files
-                for filename in ["/output.lst", "/output.mmo"]:
-                    try:
-                        stat = mmixal_module.FS.stat(filename)
-                        console.log(f"Stat for {filename}: size={stat.size}")
-                    except Exception as e:
-                        console.error(f"Error stat'ing {filename}: {e}")
-            except Exception as e:
-                console.error(f"Error listing files: {e}")
+            self._dlog("Assembling", len(source_code), "bytes in worker...")
+            result = await self.worker.assemble(source_code)
 
-            # Read outputs
-            listing = ""
-            object_code = None
+            exit_code = result.exitCode
+            has_object_code = result.objectCodeLength > 0
 
-            try:
-                listing_data = mmixal_module.FS.readFile("/output.lst", to_js({"encoding": "utf8"}))
-                # Check if we got a string or bytes
-                if hasattr(listing_data, 'length'):
-                    # It's a Uint8Array, decode it
-                    console.log(f"Got Uint8Array with length {listing_data.length}")
-                    # Convert to Python string
-                    listing = bytes(listing_data).decode('utf-8')
-                else:
-                    listing = str(listing_data)
-                console.log(f"Read listing, length: {len(listing)} chars")
-                console.log(f"Listing preview: {listing[:200] if len(listing) > 200 else listing}")
-            except Exception as e:
-                console.error(f"Error reading listing: {e}")
-
-            try:
-                # Read as Uint8Array - don't convert to Python bytes
-                object_code = mmixal_module.FS.readFile("/output.mmo")
-                console.log(f"Read object code, length: {object_code.length if hasattr(object_code, 'length') else len(object_code)} bytes")
-            except Exception as e:
-                console.error(f"Error reading object code: {e}")
-
-            # Get any console output
-            console_output = "\n".join(mmixal_output)
-
-            # Check if object code is valid (not None and has length > 0)
-            has_object_code = object_code is not None
-            if has_object_code and hasattr(object_code, 'length'):
-                has_object_code = object_code.length > 0
-            elif has_object_code:
-                has_object_code = len(object_code) > 0
-
-            console.log(f"Assembly complete - exit_code: {exit_code}, has_object_code: {has_object_code}")
+            self._dlog("Assembly complete - exit_code:", exit_code, "has_object_code:", has_object_code)
 
             return {
                 "success": exit_code == 0 and has_object_code,
-                "listing": listing,
-                "object_code": object_code,
+                # Uint8Array, decoded lazily by show_pending_listing
+                "listing": result.listing,
                 "exit_code": exit_code,
-                "console_output": console_output
+                "console_output": result.consoleOutput
             }
         except Exception as e:
-            console.error(f"Assembly error: {e}")
-            import traceback
-            console.error(traceback.format_exc())
+            console.error(f"Assembly error: {type(e).__name__}: {e}")
+            if self.debug:
+                console.error(traceback.format_exc())
             return {
                 "success": False,
                 "error": str(e),
                 "console_output": ""
             }
 
-    async def run_simulation(self, object_code):
-        """Run MMIX simulator on assembled code"""
+    async def run_simulation(self):
+        """Run MMIX simulator in the worker on the last assembled code"""
         try:
-            # Create output array for capturing print
-            mmix_output = []
-
-            # Create a fresh module instance
-            console.log("Creating fresh mmix module instance...")
-
-            # Create output callback using JavaScript directly to avoid conversion issues
-            output_captured = []
-
-            # Create config object using JavaScript
-            console.log("Setting up output capture using JavaScript eval...")
-            js.eval("""
-                window.mmixOutputCapture = [];
-                window.mmixOutCallback = function(text) {
-                    console.log('[mmixOutCallback] called with:', JSON.stringify(text), 'charCode:', text.charCodeAt(0));
-                    // Since newlines aren't being passed through, add them after each call
-                    window.mmixOutputCapture.push(text + '\\n');
-                };
-            """)
-
-            mmix_config = js.eval("""({
-                print: function(text) { window.mmixOutCallback(text); },
-                printErr: function(text) { window.mmixOutCallback(text); },
-                noInitialRun: true
-            })""")
-
-            mmix_module = await self.mmix_factory(mmix_config)
-            console.log(f"mmix module instance created")
-
-            # Write uploaded files to MEMFS so programs can access them
-            uploaded_files = self.storage.get_uploaded_files()
-            if len(uploaded_files) > 0:
-                console.log(f"Writing {len(uploaded_files)} uploaded files to MEMFS...")
-                for file_info in uploaded_files:
-                    filename = file_info["name"]
-                    content = file_info["content"]
-                    mmix_module.FS.writeFile(f"/{filename}", content)
-                    console.log(f"Wrote uploaded file: /{filename}")
-
-            # Also write saved programs to MEMFS so they can be used as input
-            saved_programs = self.storage.get_programs()
-            if len(saved_programs) > 0:
-                console.log(f"Writing {len(saved_programs)} saved programs to MEMFS...")
-                for prog in saved_programs:
-                    # Save with .mms extension
-                    filename = f"{prog['name']}.mms"
-                    content = prog["code"]
-                    mmix_module.FS.writeFile(f"/{filename}", content)
-                    console.log(f"Wrote program file: /{filename}")
-
-            # Write object code to MEMFS
-            mmix_module.FS.writeFile("/program.mmo", object_code)
-
-            # Redirect stdout to a file instead of trying to intercept writes
-            console.log("Redirecting stdout to file...")
+            # Uploaded files and saved programs are written to MEMFS so
+            # programs can access them; the cached Maps go to the worker
+            # as they are, without conversion
+            files = await self.storage.get_uploaded_files()
+            programs = await self.storage.get_programs()
+            self._dlog("Passing", files.size, "files and", programs.size, "programs to the simulator")
 
             # Get user-provided arguments
-            args_input = document.getElementById("args-input").value.strip()
-            user_args = []
+            args_input = self.el.args_input.value.strip()
+            user_args = self._no_args
             if args_input:
                 # Simple split on spaces - could be enhanced to handle quoted strings
-                user_args = [arg for arg in args_input.split() if arg]
-                console.log(f"User provided args: {user_args}")
-
-            # Run simulator with output redirected: mmix /program.mmo > /output.txt
-            # We'll use the shell-like redirection by running with -q flag and capturing
-            console.log("Running mmix simulator...")
-            # Build args: mmix -q /program.mmo [user_args]
-            # Args must come AFTER the object file
-            args_list = ["-q", "/program.mmo"] + user_args
-            args = to_js(args_list)
-            console.log(f"Calling mmix with args: {args_list}")
+                user_args = to_js([arg for arg in args_input.split() if arg])
+                self._dlog("User provided args:", user_args)
 
-            # Run the simulation
-            exit_code = mmix_module.callMain(args)
-
-            console.log(f"mmix exit code: {exit_code}")
-
-            # Try to force close any open file descriptors
+            self._dlog("Running mmix simulator in worker...")
+            self.el.stop_btn.disabled = False
             try:
-                console.log("Checking for open streams in mmix...")
-                streams = mmix_module.FS.streams
-                console.log(f"Number of streams: {len(streams) if streams else 0}")
-                if streams:
-                    for stream in streams:
-                        if stream and hasattr(stream, 'fd') and stream.fd > 2:
-                            console.log(f"Closing stream fd={stream.fd}")
-                            try:
-                                mmix_module.FS.close(stream)
-                            except:
-                                pass
-            except Exception as e:
-                console.error(f"Error closing streams: {e}")
-
-            # Get captured output from JavaScript
-            captured = js.window.mmixOutputCapture
-            console.log(f"Captured output array length: {len(captured)}")
-            console.log(f"Captured output contents: {captured}")
-
-            # Convert to Python list and join
-            output_parts = []
-            for i in range(len(captured)):
-                part = str(captured[i])
-                console.log(f"Output part {i}: {repr(part)}")
-                output_parts.append(part)
-            output = "".join(output_parts)
-            console.log(f"Joined output: {repr(output)}")
+                result = await self.worker.run(user_args, self.el.stdin_input.value, files, programs)
+            finally:
+                self.el.stop_btn.disabled = True
+
+            exit_code = result.exitCode
+            # Raw stdout/stderr bytes, decoded in one call
+            output = _DECODER.decode(result.output)
+            self._dlog("mmix exit code:", exit_code)
 
             if not output:
                 output = "(Program completed with no output)"
 
-            console.log(f"Final output: {output}")
-
             # Success if exit code is reasonable (0-15 are normal MMIX halt codes)
             # Exit code > 128 typically indicates an error
-            is_success = exit_code >= 0 and exit_code < 128
-            console.log(f"Simulation success: {is_success} (exit_code={exit_code})")
+            is_success = 0 <= exit_code < 128
+            self._dlog("Simulation success:", is_success, "exit_code:", exit_code)
 
             return {
                 "success": is_success,
@@ -802,9 +1040,9 @@ class MMIXPlayground:
                 "exit_code": exit_code
             }
         except Exception as e:
-            console.error(f"Simulation error: {e}")
-            import traceback
-            console.error(traceback.format_exc())
+            console.error(f"Simulation error: {type(e).__name__}: {e}")
+            if self.debug:
+                console.error(traceback.format_exc())
             return {
                 "success": False,
                 "error": str(e),
@@ -813,36 +1051,39 @@ class MMIXPlayground:
 
     def on_assemble_run_click(self, event):
         """Handle assemble & run button click"""
-        if not self.mmixal_factory or not self.mmix_factory:
+        if not self.modules_ready:
             self.show_error("MMIX modules not loaded yet. Please wait...")
             return
 
-        code = document.getElementById("code-editor").value
+        code = self.el.code_editor.value
         if not code.strip():
             self.show_error("Please enter some MMIX code to assemble.")
             return
 
         # Launch async assemble & run
-        asyncio.ensure_future(self._do_assemble_and_run(code))
+        self._loop.create_task(self._do_assemble_and_run(code))
 
     def on_assemble_click(self, event):
         """Handle assemble button click"""
-        if not self.mmixal_factory:
+        if not self.modules_ready:
             self.show_error("MMIX modules not loaded yet. Please wait...")
             return
 
-        code = document.getElementById("code-editor").value
+        code = self.el.code_editor.value
         if not code.strip():
             self.show_error("Please enter some MMIX code to assemble.")
             return
 
         # Launch async assembly
-        asyncio.ensure_future(self._do_assemble(code))
+        self._loop.create_task(self._do_assemble(code))
 
     def on_editor_keydown(self, event):
         """Handle keydown events in code editor"""
-        # Check for Ctrl-Enter (or Cmd-Enter on Mac)
-        if (event.ctrlKey or event.metaKey) and event.key == "Enter":
+        # Check for Ctrl-Enter (or Cmd-Enter on Mac); runs on every
+        # keystroke, so the modifiers are only read for Enter
+        if event.key != "Enter":
+            return
+        if event.ctrlKey or event.metaKey:
             event.preventDefault()
             self.on_assemble_run_click(event)
 
@@ -857,9 +1098,10 @@ class MMIXPlayground:
         result = await self.assemble(code)
 
         if result["success"]:
-            self.show_listing(result["listing"])
-            self.object_code = result["object_code"]
-            document.getElementById("run-btn").disabled = False
+            self._pending_listing = result["listing"]
+            self.switch_tab("listing")
+            self.has_object_code = True
+            self.el.run_btn.disabled = False
             self.show_status("Assembly successful!", "success")
             if result["console_output"]:
                 self.show_error(f"Assembly output:\n{result['console_output']}")
@@ -869,7 +1111,8 @@ class MMIXPlayground:
                 error_msg = f"{error_msg}\n\n{result['console_output']}"
             self.show_error(error_msg)
             self.show_status("Assembly failed", "error")
-            document.getElementById("run-btn").disabled = True
+            self.has_object_code = False
+            self.el.run_btn.disabled = True
 
     async def _do_assemble_and_run(self, code):
         """Async assemble and run handler"""
@@ -878,8 +1121,10 @@ class MMIXPlayground:
         # Switch to output tab immediately to prevent flash
         self.switch_tab("output")
 
-        # Clear previous outputs
-        self.clear_output()
+        # Only the visible pane is cleared up front; the listing and
+        # errors panes are each written once, when their content is known
+        self._pending_listing = None
+        self.el.sim.textContent = ""
 
         # Assemble
         result = await self.assemble(code)
@@ -888,70 +1133,78 @@ class MMIXPlayground:
             error_msg = result.get("error", "Assembly failed")
             if result.get("console_output"):
                 error_msg = f"{error_msg}\n\n{result['console_output']}"
-            self.show_error(error_msg)
+            self.el.listing.textContent = ""
+            self.el.err.textContent = error_msg
             self.show_status("Assembly failed", "error")
-            document.getElementById("run-btn").disabled = True
+            self.has_object_code = False
+            self.el.run_btn.disabled = True
             self.switch_tab("errors")
             return
 
-        # Assembly successful, populate listing but don't switch to it
-        document.getElementById("listing-output").textContent = result["listing"]
-        self.object_code = result["object_code"]
-        document.getElementById("run-btn").disabled = False
+        # Assembly successful, keep the listing until its tab is opened
+        self._pending_listing = result["listing"]
+        self.has_object_code = True
+        self.el.run_btn.disabled = False
+        error_msg = ""
         if result["console_output"]:
-            self.show_error(f"Assembly output:\n{result['console_output']}")
+            error_msg = f"Assembly output:\n{result['console_output']}"
 
         # Now run simulation
         self.show_status("Running simulation...")
-        sim_result = await self.run_simulation(self.object_code)
-        console.log(f"Simulation result: {sim_result}")
+        sim_result = await self.run_simulation()
+        self._dlog("Simulation exit code:", sim_result.get("exit_code"))
 
         if sim_result["success"]:
             output_text = sim_result["output"] or "(Program completed with no output)"
-            console.log(f"Displaying output: {output_text}")
-            self.show_output(output_text)
+            self.el.sim.textContent = output_text
+            self.el.err.textContent = error_msg
             self.show_status("Completed successfully!", "success")
             self.switch_tab("output")
         else:
             error_msg = sim_result.get("error", "Simulation failed")
             if sim_result.get("output"):
                 error_msg = f"{error_msg}\n\n{sim_result['output']}"
-            self.show_error(error_msg)
+            self.el.err.textContent = error_msg
             self.show_status("Simulation failed", "error")
             self.switch_tab("errors")
 
     def on_run_click(self, event):
         """Handle run button click"""
-        if not self.mmix_factory:
+        if not self.modules_ready:
             self.show_error("MMIX modules not loaded yet.")
             return
 
-        if not self.object_code:
+        if not self.has_object_code:
             self.show_error("Please assemble code first.")
             return
 
         # Launch async simulation
-        asyncio.ensure_future(self._do_run())
+        self._loop.create_task(self._do_run())
+
+    def on_stop_click(self, event):
+        """Handle stop button click - interrupt a running simulation"""
+        if self.worker.busy:
+            self.worker.restart("Simulation stopped")
+            self.show_status("Simulation stopped", "error")
 
     async def _do_run(self):
         """Async simulation handler"""
         self.show_status("Running simulation...")
 
         # Run simulation
-        result = await self.run_simulation(self.object_code)
-        console.log(f"Simulation result: {result}")
+        result = await self.run_simulation()
+        self._dlog("Simulation exit code:", result.get("exit_code"))
 
         if result["success"]:
             output_text = result["output"] or "(Program completed with no output)"
-            console.log(f"Displaying output: {output_text}")
-            self.show_output(output_text)
+            self.el.sim.textContent = output_text
             self.show_status("Simulation completed!", "success")
             self.switch_tab("output")
         else:
             error_msg = result.get("error", "Simulation failed")
             if result.get("output"):
                 error_msg = f"{error_msg}\n\n{result['output']}"
-            self.show_error(error_msg)
+            self.el.err.textContent = error_msg
             self.show_status("Simulation failed", "error")
 
 
@@ -962,54 +1215,47 @@ class MMIXPlayground:
 
     def switch_tab(self, tab_name):
         """Switch to a specific output tab"""
-        # Update tab buttons
-        tabs = document.querySelectorAll(".tab")
-        for tab in tabs:
-            if tab.getAttribute("data-tab") == tab_name:
-                tab.classList.add("active")
-            else:
-                tab.classList.remove("active")
-
-        # Update output panes
-        panes = {
-            "listing": document.getElementById("listing-output"),
-            "output": document.getElementById("simulation-output"),
-            "errors": document.getElementById("error-output")
-        }
+        if tab_name == "listing" and self._pending_listing is not None:
+            self.show_pending_listing()
 
-        for name, pane in panes.items():
-            if name == tab_name:
-                pane.classList.add("active")
-            else:
-                pane.classList.remove("active")
+        if tab_name == self._active_tab:
+            return
 
-    def show_listing(self, listing):
-        """Display assembly listing"""
-        document.getElementById("listing-output").textContent = listing
-        self.switch_tab("listing")
+        # Only the previously active and the new tab and pane change; one
+        # className write each instead of a classList call
+        self._tab_buttons[self._active_tab].className = "tab"
+        self._panes[self._active_tab].className = "output-pane"
+        self._tab_buttons[tab_name].className = "tab active"
+        self._panes[tab_name].className = "output-pane active"
+        self._active_tab = tab_name
 
-    def show_output(self, output):
-        """Display simulation output"""
-        document.getElementById("simulation-output").textContent = output
+    def show_pending_listing(self):
+        """Decode and display the listing of the last assembly"""
+        listing = _DECODER.decode(self._pending_listing)
+        self._pending_listing = None
+        self.el.listing.textContent = listing
 
     def show_error(self, error):
         """Display error message"""
-        document.getElementById("error-output").textContent = error
+        self.el.err.textContent = error
 
     def clear_output(self):
         """Clear all output panes"""
-        document.getElementById("listing-output").textContent = ""
-        document.getElementById("simulation-output").textContent = ""
-        document.getElementById("error-output").textContent = ""
+        self._pending_listing = None
+        self.el.listing.textContent = ""
+        self.el.sim.textContent = ""
+        self.el.err.textContent = ""
 
     def show_status(self, message, status_type="info"):
         """Show a status message (could be enhanced with a status bar)"""
-        console.log(f"[{status_type}] {message}")
+        # Several per run; only failures are logged unless tracing
+        if self.debug or status_type == "error":
+            console.log(f"[{status_type}] {message}")
 
 # Initialize the playground
 console.log("Creating MMIXPlayground instance...")
 playground = MMIXPlayground()
 console.log("MMIXPlayground initialized")
 
-# Expose to JavaScript for onclick handlers
+# Expose to JavaScript, e.g. for playground.debug = true in the console
 js.window.playground = playground
@@ -0,0 +1,224 @@
+// Web Worker for the MMIX Playground
+// Runs mmixal and mmix off the main thread so long simulations do not
+// block the UI; the main thread can stop a runaway program by terminating
+// this worker. Requests are {id, type: 'assemble', source} and
+// {id, type: 'run', objectCode, args, stdin, files, programs}, where stdin
+// is the text the program reads from StdIn and files and programs map
+// names to contents; every reply carries the id. The worker
+// keeps the object code of the last assembly, so run only needs to carry
+// objectCode when it was assembled by an earlier worker.
+
+const baseUrl = `${self.location.origin}/mmix`;
+
+async function compileWasm(url) {
+    try {
+        return await WebAssembly.compileStreaming(fetch(url));
+    } catch (e) {
+        // compileStreaming requires the application/wasm MIME type
+        const response = await fetch(url);
+        return await WebAssembly.compile(await response.arrayBuffer());
+    }
+}
+
+function createWith(factory, wasmModule, config) {
+    // Emscripten's instantiateWasm hook, reusing a compiled module. A failed
+    // instantiation never reaches receiveInstance, so the factory promise
+    // would not settle; it rejects the returned promise instead.
+    return new Promise((resolve, reject) => {
+        const instantiateWasm = (imports, receiveInstance) => {
+            WebAssembly.instantiate(wasmModule, imports)
+                .then((instance) => receiveInstance(instance, wasmModule))
+                .catch(reject);
+            return {};
+        };
+        factory({ ...config, instantiateWasm }).then(resolve, reject);
+    });
+}
+
+// Start all four downloads at once. Both tools keep their state in C
+// globals and exit after main, so each call gets a fresh instance, but
+// the WASM is only compiled once.
+const modules = Promise.all([
+    import(`${baseUrl}/mmixal.js`),
+    import(`${baseUrl}/mmix.js`),
+    compileWasm(`${baseUrl}/mmixal.wasm`),
+    compileWasm(`${baseUrl}/mmix.wasm`)
+]).then(([mmixalNs, mmixNs, mmixalWasm, mmixWasm]) => ({
+    createMMIXAL: (config) => createWith(mmixalNs.default, mmixalWasm, config),
+    createMMIX: (config) => createWith(mmixNs.default, mmixWasm, config)
+}));
+
+// Collects bytes in a Uint8Array that doubles in size as it fills
+class ByteSink {
+    constructor() {
+        this.bytes = new Uint8Array(4096);
+        this.length = 0;
+    }
+
+    push(byte) {
+        if (this.length === this.bytes.length) {
+            const grown = new Uint8Array(this.bytes.length * 2);
+            grown.set(this.bytes);
+            this.bytes = grown;
+        }
+        this.bytes[this.length++] = byte;
+    }
+
+    contents() {
+        return this.bytes.subarray(0, this.length);
+    }
+}
+
+// An instance cannot be reused, but the next one can be created while
+// the page is idle: take() hands out the instance warmed in advance and
+// starts warming its replacement once the caller is done with it.
+// capture() returns the config options for an instance along with the
+// collectors they read from or write to.
+class Spare {
+    constructor(create, capture) {
+        this.create = create;
+        this.capture = capture;
+        this.next = this.warm();
+    }
+
+    warm() {
+        const { config, ...collectors } = this.capture();
+        const instance = modules
+            .then((factories) => this.create(factories)({ ...config, noInitialRun: true }))
+            .then((module) => ({ module, ...collectors }));
+        instance.catch(() => {});  // Reported by take()
+        return instance;
+    }
+
+    take() {
+        const instance = this.next;
+        // Warm the replacement only after the current call has run, so it
+        // never competes with it
+        const settled = instance.then(() => {}, () => {});
+        this.next = settled
+            .then(() => new Promise((resolve) => setTimeout(resolve, 0)))
+            .then(() => this.warm());
+        this.next.catch(() => {});  // Reported by take()
+        return instance;
+    }
+}
+
+const spares = {
+    // Assembler messages are short; print is called once per line
+    mmixal: new Spare((factories) => factories.createMMIXAL, () => {
+        const output = [];
+        const capture = (text) => output.push(String(text));
+        return { output, config: { print: capture, printErr: capture } };
+    }),
+    // Program output can be large and binary: stdout/stderr are called
+    // once per byte, so it is collected raw and decoded once by the page
+    mmix: new Spare((factories) => factories.createMMIX, () => {
+        const output = new ByteSink();
+        const capture = (byte) => {
+            if (byte !== null) {
+                output.push(byte);
+            }
+        };
+        // A worker has no window.prompt, Emscripten's default stdin, so
+        // StdIn is fed byte by byte from the text sent with the run;
+        // null signals end of file
+        const input = { bytes: new Uint8Array(0), pos: 0 };
+        const read = () => input.pos < input.bytes.length ? input.bytes[input.pos++] : null;
+        return { output, input, config: { stdout: capture, stderr: capture, stdin: read } };
+    })
+};
+
+// FS.writeFile converts strings to UTF-8 one character at a time in JS;
+// a Uint8Array is copied into MEMFS with a single set()
+const utf8Encoder = new TextEncoder();
+
+// The contents of a MEMFS file without copying them. FS.readFile copies
+// the whole file into a new array; since the instance is discarded after
+// the call, its file storage can be handed over (and transferred) as is.
+function takeFile(module, path) {
+    const node = module.FS.lookupPath(path).node;
+    if (node.contents instanceof Uint8Array) {
+        return node.contents.subarray(0, node.usedBytes);
+    }
+    return module.FS.readFile(path);
+}
+
+// Object code of the last assembly, written to every mmix instance
+let lastObjectCode = new Uint8Array(0);
+
+async function assemble(source) {
+    const { module: mmixal, output } = await spares.mmixal.take();
+
+    // mmixal -l /output.lst -o /output.mmo /input.mms
+    mmixal.FS.writeFile('/input.mms', utf8Encoder.encode(source));
+    const exitCode = mmixal.callMain(['-l', '/output.lst', '-o', '/output.mmo', '/input.mms']);
+
+    // Raw bytes; the main thread only decodes them when the listing is shown
+    let listing = new Uint8Array(0);
+    try {
+        listing = takeFile(mmixal, '/output.lst');
+    } catch (e) {
+        console.error('Error reading listing:', e);
+    }
+
+    let objectCode = new Uint8Array(0);
+    try {
+        objectCode = takeFile(mmixal, '/output.mmo');
+    } catch (e) {
+        console.error('Error reading object code:', e);
+    }
+
+    // The page gets a copy to resend after a restart; the original stays
+    // here for run
+    lastObjectCode = objectCode;
+    const pageCopy = objectCode.slice();
+    return {
+        reply: { exitCode, listing, objectCode: pageCopy, consoleOutput: output.join('\n') },
+        transfer: [listing.buffer, pageCopy.buffer]
+    };
+}
+
+async function run(objectCode, args, stdin, files, programs) {
+    if (objectCode) {
+        lastObjectCode = objectCode;
+    }
+    const { module: mmix, output, input } = await spares.mmix.take();
+    input.bytes = utf8Encoder.encode(stdin || '');
+
+    // Uploaded files and saved programs, so programs can open them
+    for (const [name, content] of files) {
+        mmix.FS.writeFile(`/${name}`, content);
+    }
+    for (const [name, code] of programs) {
+        mmix.FS.writeFile(`/${name}.mms`, code);
+    }
+    mmix.FS.writeFile('/program.mmo', lastObjectCode);
+
+    // mmix -q /program.mmo [args]; args must come after the object file
+    const exitCode = mmix.callMain(['-q', '/program.mmo', ...args]);
+
+    const bytes = output.contents();
+    return { reply: { exitCode, output: bytes }, transfer: [bytes.buffer] };
+}
+
+self.onmessage = async (event) => {
+    const message = event.data;
+    try {
+        let result;
+        if (message.type === 'assemble') {
+            result = await assemble(message.source);
+        } else if (message.type === 'run') {
+            result = await run(message.objectCode, message.args, message.stdin, message.files, message.programs);
+        } else {
+            throw new Error(`Unknown request type: ${message.type}`);
+        }
+        self.postMessage({ id: message.id, ...result.reply }, result.transfer);
+    } catch (e) {
+        self.postMessage({ id: message.id, error: String(e && e.message || e) });
+    }
+};
+
+modules.then(
+    () => self.postMessage({ type: 'ready' }),
+    (e) => self.postMessage({ type: 'ready', error: String(e && e.message || e) })
+);
@@ -0,0 +1,46 @@
+// Service Worker for the MMIX Playground
+// Serves the Emscripten modules under /mmix/ cache-first so reloads skip
+// the network and reuse the browser's compiled WASM.
+// The cache name is keyed on the ?v= query of the registration URL; bump
+// MODULES_VERSION in mmix-playground.py after rebuilding the modules.
+
+const CACHE_NAME = `mmix-modules-${new URL(self.location).searchParams.get('v') || '0'}`;
+
+self.addEventListener('install', (event) => {
+    self.skipWaiting();
+});
+
+self.addEventListener('activate', (event) => {
+    // Drop caches from previous module versions
+    event.waitUntil(
+        caches.keys()
+            .then((names) => Promise.all(
+                names
+                    .filter((name) => name.startsWith('mmix-modules-') && name !== CACHE_NAME)
+                    .map((name) => caches.delete(name))
+            ))
+            .then(() => self.clients.claim())
+    );
+});
+
+self.addEventListener('fetch', (event) => {
+    const url = new URL(event.request.url);
+    if (event.request.method !== 'GET' || url.origin !== self.location.origin ||
+            !url.pathname.startsWith('/mmix/')) {
+        return;
+    }
+
+    event.respondWith(
+        caches.open(CACHE_NAME).then(async (cache) => {
+            const cached = await cache.match(event.request);
+            if (cached) {
+                return cached;
+            }
+            const response = await fetch(event.request);
+            if (response.ok) {
+                cache.put(event.request, response.clone());
+            }
+            return response;
+        })
+    );
+});